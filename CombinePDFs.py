@@ -1,5 +1,103 @@
 import os
-from PyPDF2 import PdfMerger
+from contextlib import ExitStack
+from pypdf import PdfReader, PdfWriter
+
+# PyMuPDF (MuPDF) and pikepdf (qpdf) merge much faster than pypdf; use the
+# fastest one that is installed
+try:
+    import pymupdf as fitz  # PyMuPDF
+except ImportError:
+    try:
+        import fitz  # PyMuPDF releases before 1.24.3
+    except ImportError:
+        fitz = None
+
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
+def merge_with_fitz(pdf_paths, output_path):
+    """
+    Merge the given PDFs into output_path using PyMuPDF.
+    """
+    out = fitz.open()
+    toc = []
+    try:
+        for pdf_path in pdf_paths:
+            print(f"Adding: {pdf_path}")
+            # insert_pdf copies the pages right away, so each source can be closed
+            with fitz.open(pdf_path) as src:
+                # insert_pdf leaves the bookmarks behind; gather them, shifted
+                # past the pages already added (-1 marks one with no target page)
+                offset = out.page_count
+                toc.extend([level, title, page + offset if page > 0 else page]
+                           for level, title, page in src.get_toc())
+                out.insert_pdf(src)
+        out.set_toc(toc)
+        # garbage=3 drops unused and merges duplicate objects to shrink the output
+        out.save(output_path, deflate=True, garbage=3)
+    finally:
+        out.close()
+
+def copy_pikepdf_outline(items, page_numbers, offset):
+    """
+    Rebuild pikepdf outline items for the merged PDF, pointing each bookmark
+    at its page's position in the output.
+    """
+    copies = []
+    for item in items:
+        dest = item.destination
+        if dest is None and item.action is not None and item.action.get('/S') == '/GoTo':
+            dest = item.action.get('/D')
+        # Explicit destinations start with the target page; anything else
+        # (e.g. a named destination) keeps its title but no target
+        page = None
+        if isinstance(dest, pikepdf.Array) and len(dest) > 0 and isinstance(dest[0], pikepdf.Dictionary):
+            page = page_numbers.get(dest[0].objgen)
+        copy = pikepdf.OutlineItem(item.title, page + offset if page is not None else None)
+        copy.children.extend(copy_pikepdf_outline(item.children, page_numbers, offset))
+        copies.append(copy)
+    return copies
+
+def merge_with_pikepdf(pdf_paths, output_path):
+    """
+    Merge the given PDFs into output_path using pikepdf.
+    """
+    # Sources must stay open until the output is saved, since qpdf copies
+    # their page streams lazily at save time
+    with ExitStack() as stack:
+        out = stack.enter_context(pikepdf.Pdf.new())
+        outline = []
+        for pdf_path in pdf_paths:
+            print(f"Adding: {pdf_path}")
+            src = stack.enter_context(pikepdf.Pdf.open(pdf_path))
+            # Carry the bookmarks across, shifted past the pages already added
+            with src.open_outline() as src_outline:
+                page_numbers = {page.obj.objgen: i for i, page in enumerate(src.pages)}
+                outline.extend(copy_pikepdf_outline(src_outline.root, page_numbers, len(out.pages)))
+            out.pages.extend(src.pages)
+        with out.open_outline() as out_outline:
+            out_outline.root.extend(outline)
+        out.save(output_path)
+
+def merge_with_pypdf(pdf_paths, output_path):
+    """
+    Merge the given PDFs into output_path using pypdf.
+    """
+    # Copy the pages of each PDF into the writer, closing each source as soon
+    # as it's done so only one input is held open at a time
+    writer = PdfWriter()
+    for pdf_path in pdf_paths:
+        print(f"Adding: {pdf_path}")
+        with open(pdf_path, 'rb') as f:
+            reader = PdfReader(f)
+            # append() copies the bookmarks along with the pages
+            writer.append(reader)
+        del reader
+
+    with open(output_path, 'wb') as f:
+        writer.write(f)
 
 def combine_pdfs(folder_path, output_filename="combined.pdf"):
     """
@@ -12,31 +110,27 @@ def combine_pdfs(folder_path, output_filename="combined.pdf"):
     Returns:
         str: The path to the combined PDF.
     """
-    # Create a PdfMerger object
-    merger = PdfMerger()
-
     # Get a sorted list of PDF files in the folder
     pdf_files = sorted(
-        [f for f in os.listdir(folder_path) if f.endswith('.pdf')],
-        key=lambda x: x.lower()  # Sort case-insensitively
+        [e for e in os.scandir(folder_path) if e.is_file() and e.name.endswith('.pdf')],
+        key=lambda x: x.name.lower()  # Sort case-insensitively
     )
 
     if not pdf_files:
         print("No PDF files found in the specified folder.")
         return None
 
-    # Add each PDF file to the merger
-    for pdf in pdf_files:
-        pdf_path = os.path.join(folder_path, pdf)
-        print(f"Adding: {pdf_path}")
-        merger.append(pdf_path)
-
     # Define the output file path
     output_path = os.path.join(folder_path, output_filename)
 
     # Write the combined PDF to the output file
-    merger.write(output_path)
-    merger.close()
+    pdf_paths = [pdf.path for pdf in pdf_files]
+    if fitz is not None:
+        merge_with_fitz(pdf_paths, output_path)
+    elif pikepdf is not None:
+        merge_with_pikepdf(pdf_paths, output_path)
+    else:
+        merge_with_pypdf(pdf_paths, output_path)
 
     print(f"Combined PDF saved as: {output_path}")
     return output_path
@@ -46,4 +140,3 @@ if __name__ == "__main__":
     folder_path = input("Enter the folder path containing PDFs (default .): ").strip() or "."
     output_filename = input("Enter the name for the combined PDF (default: combined.pdf): ").strip() or "combined.pdf"
     combine_pdfs(folder_path, output_filename)
-
@@ -1,6 +1,7 @@
 import os
 import email
-from bs4 import BeautifulSoup
+from io import BytesIO
+from bs4 import BeautifulSoup, SoupStrainer
 from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
@@ -11,24 +12,29 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 from collections import defaultdict
 from datetime import datetime
-import pytz
+from zoneinfo import ZoneInfo
 import re
-import sys
+import argparse
+import multiprocessing
+from contextlib import nullcontext
+from itertools import starmap
+
+EASTERN = ZoneInfo('US/Eastern')
 
 def format_date(date_str):
     # Parse the email date
     dt = email.utils.parsedate_to_datetime(date_str)
     
     # Convert to Eastern Time
-    eastern = pytz.timezone('US/Eastern')
-    dt_eastern = dt.astimezone(eastern)
+    dt_eastern = dt.astimezone(EASTERN)
     
     # Format with timezone abbreviation
     return dt_eastern.strftime('%B %d, %Y %I:%M %p %Z')
 
 def extract_content(eml_file):
-    with open(eml_file, 'r', encoding='utf-8') as f:
-        msg = email.message_from_file(f)
+    # Parse the raw bytes; only the HTML part needs decoding, below
+    with open(eml_file, 'rb') as f:
+        msg = email.message_from_binary_file(f)
     
     date = format_date(msg.get('Date', ''))
     
@@ -37,8 +43,29 @@ def extract_content(eml_file):
             return date, part.get_payload(decode=True).decode()
     return date, ""
 
+# Jr/Sr suffix at the end of a full name, and as a standalone name part
+SUFFIX_AT_END_RE = re.compile(r'\b(Jr|Sr|Jr\.|Sr\.)$', re.IGNORECASE)
+SUFFIX_WORD_RE = re.compile(r'\b(Jr|Sr|Jr\.|Sr\.)\b', re.IGNORECASE)
+
+# Questions whose answers are reduced to Yes/No
+YES_NO_QUESTIONS = frozenset([
+    "Have you been baptized by immersion following salvation?",
+    "Have you completed the Getting Connected/Membership class?",
+])
+
+# Contact details are always shown on the same line as their question
+ONE_LINE_QUESTIONS = frozenset(["Email address", "Phone number", "Birthday", "Address", "Primary campus"])
+
+# Number of .eml files parsed and converted per batch in process_eml_files
+CHUNK_SIZE = 256
+
+# Only the member's answer table is ever read, so skip building the rest of the tree;
+# match the class as one token, since the table may carry other classes too
+CONTENT_TABLE_STRAINER = SoupStrainer(
+    'table', attrs={'class': lambda c: c and 'content-table' in c.split()})
+
 def parse_html_content(html_content):
-    soup = BeautifulSoup(html_content, 'html.parser')
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=CONTENT_TABLE_STRAINER)
     table = soup.find('table', class_='content-table')
     if not table:
         return None, {}
@@ -83,10 +110,8 @@ def parse_html_content(html_content):
             for br in cell.find_all('br'):
                 br.replace_with('\n')
             answer = cell.get_text()
-            # Clean up but preserve intentional line breaks
-            answer = '\n'.join(line.strip() for line in answer.split('\n'))
-            # Remove empty lines while preserving paragraph breaks
-            answer = '\n'.join(filter(None, answer.split('\n')))
+            # Strip each line and drop empty ones, keeping intentional line breaks
+            answer = '\n'.join(s for s in (line.strip() for line in answer.splitlines()) if s)
             questions[question] = answer
     
     return name, questions
@@ -96,18 +121,15 @@ def normalize_name(name):
     Normalize a name for comparison purposes.
     Remove comments, extra spaces, and convert to lowercase.
     """
-    if "#" in name:
-        name = name.split("#", 1)[0]
+    name = name.partition("#")[0]
     return " ".join(name.lower().split())
 
 def split_name_and_comment(name_line):
     """
     Split a line into name and comment parts.
     """
-    if "#" in name_line:
-        name, comment = name_line.split("#", 1)
-        return name.strip(), "#" + comment
-    return name_line.strip(), ""
+    name, sep, comment = name_line.partition("#")
+    return name.strip(), sep + comment
 
 def format_name_for_file(name, comments_dict=None):
     """
@@ -115,12 +137,10 @@ def format_name_for_file(name, comments_dict=None):
     Handle Jr/Sr suffixes and preserve comments.
     """
     # Check for comments in the name
-    comment = ""
-    name_part = name
-    if "#" in name:
-        name_part, comment = name.split("#", 1)
+    name_part, sep, comment = name.partition("#")
+    if sep:
         name_part = name_part.strip()
-        comment = "#" + comment
+        comment = sep + comment
     
     # Check for existing comment in the dictionary
     normalized = normalize_name(name_part)
@@ -131,7 +151,7 @@ def format_name_for_file(name, comments_dict=None):
     parts = name_part.split()
     
     # Check for Jr/Sr suffixes
-    suffix_match = re.search(r'\b(Jr|Sr|Jr\.|Sr\.)$', name_part, re.IGNORECASE)
+    suffix_match = SUFFIX_AT_END_RE.search(name_part)
     if suffix_match and len(parts) >= 3:
         # Remove suffix (could be at the end)
         suffix = parts.pop()
@@ -158,8 +178,7 @@ def get_sort_key(name):
     and extracting the name part if there's a comment.
     """
     # Remove comment if exists
-    if "#" in name:
-        name = name.split("#", 1)[0].strip()
+    name = name.partition("#")[0]
     
     # Split name into parts
     parts = name.split()
@@ -169,7 +188,7 @@ def get_sort_key(name):
         return ""
     
     # Handle Jr/Sr suffixes - if the second part is Jr/Sr, the last name is the last part
-    if len(parts) >= 3 and re.search(r'\b(Jr|Sr|Jr\.|Sr\.)\b', parts[1], re.IGNORECASE):
+    if len(parts) >= 3 and SUFFIX_WORD_RE.search(parts[1]):
         return parts[-1]
     
     # Get the last part as the last name
@@ -198,42 +217,42 @@ def read_existing_file_data(names_file):
         return campus_names, comments_dict, submission_line
     
     with open(names_file, 'r') as f:
-        current_campus = None
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Detect campus headers
-            if line.startswith("==") and line.endswith("=="):
-                current_campus = line[2:-2].strip()
-            # Detect submission line
-            elif line.startswith("Above Submitted by"):
-                submission_line = line
-            # Process name entries
-            elif current_campus:
-                campus_names[current_campus].append(line)
-                
-                # Store comments for future reference
-                name_part, comment_part = split_name_and_comment(line)
-                if comment_part:
-                    comments_dict[normalize_name(name_part)] = comment_part
+        data = f.read()
+    
+    current_campus = None
+    for line in data.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Detect campus headers
+        if line.startswith("==") and line.endswith("=="):
+            current_campus = line[2:-2].strip()
+        # Detect submission line
+        elif line.startswith("Above Submitted by"):
+            submission_line = line
+        # Process name entries
+        elif current_campus:
+            campus_names[current_campus].append(line)
+            
+            # Store comments for future reference
+            name_part, sep, comment_part = line.partition("#")
+            if sep:
+                comments_dict[normalize_name(name_part)] = sep + comment_part
     
     return campus_names, comments_dict, submission_line
 
 def collect_member_data(eml_files):
     """
-    Collect member data from all .eml files.
-    Returns a list of (name, campus) tuples.
+    Collect member data from all .eml files, parsing each file once.
+    Returns a list of (eml_file, date, name, questions) tuples.
     """
     members_data = []
     
     for eml_file in eml_files:
         date, html_content = extract_content(eml_file)
         name, questions = parse_html_content(html_content)
-        
-        if name and "Primary campus" in questions:
-            members_data.append((name, questions["Primary campus"]))
+        members_data.append((eml_file, date, name, questions))
             
     return members_data
 
@@ -256,6 +275,12 @@ def update_names_file(members_data, replace_file=True):
         # In append mode, use existing campus names
         campus_names = existing_campus_names
     
+    # Normalized names already listed under each campus, for append mode
+    seen = defaultdict(set)
+    if not replace_file:
+        for campus, names in campus_names.items():
+            seen[campus] = {normalize_name(split_name_and_comment(n)[0]) for n in names}
+    
     # Process and add all member data
     for name, campus in members_data:
         # Format the name for the file, preserving comments
@@ -265,8 +290,8 @@ def update_names_file(members_data, replace_file=True):
         if not replace_file:
             # Only add if not already in the list (for append mode)
             normalized = normalize_name(split_name_and_comment(formatted_name)[0])
-            existing_names = [normalize_name(split_name_and_comment(n)[0]) for n in campus_names[campus]]
-            if normalized not in existing_names:
+            if normalized not in seen[campus]:
+                seen[campus].add(normalized)
                 campus_names[campus].append(formatted_name)
         else:
             # Always add in replace mode
@@ -296,16 +321,88 @@ def update_names_file(members_data, replace_file=True):
             f.write(submission_line + '\n')
         f.write(f"Above Submitted by {today}\n")
 
-def create_document_files(eml_file, create_word=False):
+_STYLES = None
+
+def _get_styles():
     """
-    Create PDF files for a member, and optionally DOCX files if create_word is True.
+    Build the PDF paragraph styles on first use and reuse them for every member.
+    Returns (title_style, date_style, question_style, answer_style, footer_style).
     """
-    if not os.path.exists('WordDocs'):
-        os.makedirs('WordDocs')
+    global _STYLES
+    if _STYLES is None:
+        styles = getSampleStyleSheet()
         
-    date, html_content = extract_content(eml_file)
-    name, questions = parse_html_content(html_content)
-    
+        # Title style
+        title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            alignment=TA_CENTER,
+            fontSize=14,
+            spaceAfter=20
+        )
+        
+        # Submission date style
+        date_style = ParagraphStyle(
+            'Date',
+            parent=styles['Normal'],
+            alignment=TA_CENTER,
+            fontSize=10,
+            spaceBefore=6,
+            spaceAfter=12
+        )
+        
+        # Question style
+        question_style = ParagraphStyle(
+            'Question',
+            parent=styles['Normal'],
+            fontSize=11,
+            fontName='Helvetica-Bold',
+            spaceAfter=0,
+            spaceBefore=12
+        )
+        
+        # Answer style
+        answer_style = ParagraphStyle(
+            'Answer',
+            parent=styles['Normal'],
+            spaceAfter=0
+        )
+        
+        # Footer style
+        footer_style = ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            alignment=TA_RIGHT,
+            fontSize=8
+        )
+        
+        _STYLES = (title_style, date_style, question_style, answer_style, footer_style)
+    return _STYLES
+
+_WORD_TEMPLATE = None
+
+def _new_word_document():
+    """
+    Return a new Word document with single-spaced, unpadded Normal style.
+    The style is set up once on a template that each document is loaded from.
+    """
+    global _WORD_TEMPLATE
+    if _WORD_TEMPLATE is None:
+        template = Document()
+        template.styles['Normal'].paragraph_format.line_spacing = 1.0
+        template.styles['Normal'].paragraph_format.space_after = Pt(0)
+        template.styles['Normal'].paragraph_format.space_before = Pt(0)
+        
+        buf = BytesIO()
+        template.save(buf)
+        _WORD_TEMPLATE = buf.getvalue()
+    return Document(BytesIO(_WORD_TEMPLATE))
+
+def create_document_files(date, name, questions, create_word=False):
+    """
+    Create PDF files for a member from their parsed submission, and optionally
+    DOCX files if create_word is True. The WordDocs folder must already exist.
+    """
     name_parts = name.split()
     if len(name_parts) >= 2:
         lastname, firstname = name_parts[-1], name_parts[0]
@@ -320,12 +417,19 @@ def create_document_files(eml_file, create_word=False):
     def is_short_answer(answer):
         return len(answer) < 50 and '\n' not in answer
     
+    # Clean up each answer once for both the Word and PDF output
+    answers = []
+    for question, answer in questions.items():
+        answer = answer.strip() if answer else "Not Provided"
+        if question in YES_NO_QUESTIONS:
+            answer_lower = answer.lower()
+            answer = "Yes" if "yes" in answer_lower else "No" if "no" in answer_lower else answer
+        one_line = question in ONE_LINE_QUESTIONS or is_short_answer(answer)
+        answers.append((question, answer, one_line))
+    
     # Create Word document if requested
     if create_word:
-        doc = Document()
-        doc.styles['Normal'].paragraph_format.line_spacing = 1.0
-        doc.styles['Normal'].paragraph_format.space_after = Pt(0)
-        doc.styles['Normal'].paragraph_format.space_before = Pt(0)
+        doc = _new_word_document()
             
         # Title
         title = doc.add_paragraph()
@@ -341,26 +445,14 @@ def create_document_files(eml_file, create_word=False):
         date_run.font.size = Pt(10)
                 
         # Add questions and answers
-        for question, answer in questions.items():
+        for question, answer, one_line in answers:
             doc.add_paragraph()
             
-            answer = answer.strip() if answer else "Not Provided"
-            if question in ["Have you been baptized by immersion following salvation?",
-                           "Have you completed the Getting Connected/Membership class?"]:
-                answer = "Yes" if "yes" in answer.lower() else "No" if "no" in answer.lower() else answer
-            
-            if question in ["Email address", "Phone number", "Birthday", "Address", "Primary campus"]:
-                p = doc.add_paragraph()
-                q_run = p.add_run(question)
-                q_run.bold = True
-                p.add_run(f": {answer}")
-                continue
-                    
             p = doc.add_paragraph()
             q_run = p.add_run(question)
             q_run.bold = True
             
-            if is_short_answer(answer):
+            if one_line:
                 p.add_run(": " + answer)
             else:
                 doc.add_paragraph(answer)
@@ -368,72 +460,22 @@ def create_document_files(eml_file, create_word=False):
         # Save Word document
         doc.save(docx_filename)
             
-    # Create PDF
-    doc = SimpleDocTemplate(pdf_filename, pagesize=letter,
+    # Create PDF in memory and write it out in one go once it's built
+    pdf_buffer = BytesIO()
+    doc = SimpleDocTemplate(pdf_buffer, pagesize=letter,
                          leftMargin=36, rightMargin=36,
                          topMargin=36, bottomMargin=36)  # 36 points = 0.5 inches
-    styles = getSampleStyleSheet()
+    title_style, date_style, question_style, answer_style, footer_style = _get_styles()
     story = []
                  
-    # Title style
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        alignment=TA_CENTER,
-        fontSize=14,
-        spaceAfter=20
-    )
-                 
     # Add title
     story.append(Paragraph(name, title_style))
     
     # Add submission date
-    date_style = ParagraphStyle(
-        'Date',
-        parent=styles['Normal'],
-        alignment=TA_CENTER,
-        fontSize=10,
-        spaceBefore=6,
-        spaceAfter=12
-    )
     story.append(Paragraph(f"Submitted: {date}", date_style))
             
-    # Question style
-    question_style = ParagraphStyle(
-        'Question',
-        parent=styles['Normal'],
-        fontSize=11,
-        fontName='Helvetica-Bold',
-        spaceAfter=0,
-        spaceBefore=12
-    )
-            
-    # Answer style
-    answer_style = ParagraphStyle(
-        'Answer',
-        parent=styles['Normal'],
-        spaceAfter=0
-    )
-            
-    # Footer style
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        alignment=TA_RIGHT,
-        fontSize=8
-    )
-            
-    for question, answer in questions.items():
-        answer = answer.strip() if answer else "Not Provided"
-        if question in ["Have you been baptized by immersion following salvation?",
-                       "Have you completed the Getting Connected/Membership class?"]:
-            answer = "Yes" if "yes" in answer.lower() else "No" if "no" in answer.lower() else answer
-            
-        if question in ["Email address", "Phone number", "Birthday", "Address", "Primary campus"]:
-            story.append(Paragraph(f"<b>{question}</b>: {answer}", answer_style))
-            continue
-            
-        if is_short_answer(answer):
+    for question, answer, one_line in answers:
+        if one_line:
             story.append(Paragraph(f"<b>{question}</b>: {answer}", answer_style))
         else:
             story.append(Paragraph(f"<b>{question}</b>", question_style))
@@ -451,15 +493,17 @@ def create_document_files(eml_file, create_word=False):
             canvas.restoreState()
          
     doc.build(story, onFirstPage=add_footer, onLaterPages=add_footer)
+    with open(pdf_filename, 'wb') as f:
+        f.write(pdf_buffer.getvalue())
     
     if create_word:
         return docx_filename, pdf_filename
     else:
         return None, pdf_filename
 
-def process_eml_files(create_word=False):
+def process_eml_files(create_word=False, jobs=None):
     # Collect all .eml files
-    eml_files = [filename for filename in os.listdir('.') if filename.endswith('.eml')]
+    eml_files = [e.name for e in os.scandir('.') if e.is_file() and e.name.endswith('.eml')]
     
     if not eml_files:
         print("No .eml files found in the current directory.")
@@ -477,21 +521,52 @@ def process_eml_files(create_word=False):
                 break
             print("Invalid choice. Please enter 'R' or 'A'.")
     
-    # Collect member data from all files
-    members_data = collect_member_data(eml_files)
+    # Create the output folder once here so the workers don't race on it
+    os.makedirs('WordDocs', exist_ok=True)
     
-    # Update the names file with all collected data
-    update_names_file(members_data, replace_file)
+    # (name, campus) pairs for the names file, gathered across all chunks
+    names_data = []
     
-    # Create document files for each .eml file
-    for eml_file in eml_files:
-        docx_file, pdf_file = create_document_files(eml_file, create_word)
-        if create_word:
-            print(f"Processed {eml_file} -> {docx_file}, {pdf_file}")
-        else:
-            print(f"Processed {eml_file} -> {pdf_file}")
+    # No more workers than files; each worker re-imports reportlab, docx and
+    # bs4, which costs more than converting a few documents, so with a single
+    # worker the documents are converted in-process
+    workers = min(jobs or os.cpu_count() or 1, len(eml_files))
+    
+    with multiprocessing.Pool(processes=workers) if workers > 1 else nullcontext() as pool:
+        # Work through the files a chunk at a time so only one chunk's parsed
+        # data is held in memory at once
+        for start in range(0, len(eml_files), CHUNK_SIZE):
+            # Parse each file once; the results feed both the names file and the documents
+            members_data = collect_member_data(eml_files[start:start + CHUNK_SIZE])
+            
+            names_data.extend((name, questions["Primary campus"])
+                              for _, _, name, questions in members_data
+                              if name and "Primary campus" in questions)
+            
+            # Create document files for each .eml file in parallel
+            doc_args = [(date, name, questions, create_word)
+                        for _, date, name, questions in members_data]
+            if pool is not None:
+                results = pool.starmap(create_document_files, doc_args)
+            else:
+                results = list(starmap(create_document_files, doc_args))
+            
+            for (eml_file, _, _, _), (docx_file, pdf_file) in zip(members_data, results):
+                if create_word:
+                    print(f"Processed {eml_file} -> {docx_file}, {pdf_file}")
+                else:
+                    print(f"Processed {eml_file} -> {pdf_file}")
+    
+    # Update the names file with all collected data
+    update_names_file(names_data, replace_file)
 
 if __name__ == "__main__":
-    # Check for command line arguments
-    create_word = "-w" in sys.argv
-    process_eml_files(create_word)
+    parser = argparse.ArgumentParser(description='Convert membership .eml files into PDF (and optionally DOCX) files.')
+    parser.add_argument('-w', '--word', action='store_true',
+                        help='Also create Word documents')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='Number of worker processes (default: number of CPUs)')
+    
+    args = parser.parse_args()
+    
+    process_eml_files(args.word, args.jobs)
@@ -1,5 +1,8 @@
 from PIL import Image
 import os
+from io import BytesIO
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.utils import ImageReader
@@ -8,6 +11,26 @@ from collections import defaultdict
 import random
 import argparse
 
+def _resize(path, target_size):
+    """
+    Open and shrink one image, returning it as in-memory JPEG bytes.
+    Runs in a worker process; returns None if the image can't be read.
+    """
+    try:
+        img = Image.open(path)
+        # Let libjpeg decode large JPEGs at a reduced scale (no-op for other formats);
+        # twice the target size leaves headroom for the LANCZOS resample
+        img.draft('RGB', (target_size[0] * 2, target_size[1] * 2))
+        img = img.convert('RGB')
+        img.thumbnail(target_size, Image.Resampling.LANCZOS)
+        
+        buf = BytesIO()
+        img.save(buf, format='JPEG', quality=85)
+        return buf.getvalue()
+    except Exception as e:
+        print(f"Error processing {os.path.basename(path)}: {str(e)}")
+        return None
+
 def process_images(input_dir, output_pdf, random_mode=False, images_per_page=20, target_size=(400, 300)):
     """
     Combine multiple resized images onto PDF pages with captions.
@@ -20,14 +43,14 @@ def process_images(input_dir, output_pdf, random_mode=False, images_per_page=20,
     last_name_groups = defaultdict(list)
     singles = []
     
-    for f in os.listdir(input_dir):
-        if f.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-            base_name = os.path.splitext(f)[0]
+    for entry in os.scandir(input_dir):
+        if entry.is_file() and entry.name.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
+            base_name = os.path.splitext(entry.name)[0]
             try:
                 first_name, last_name = base_name.split(' ', 1)
-                last_name_groups[last_name].append((f, first_name))
+                last_name_groups[last_name].append((entry, first_name))
             except ValueError:
-                singles.append((f, base_name))
+                singles.append((entry, base_name))
     
     # Process groups and singles
     final_files = []
@@ -40,11 +63,11 @@ def process_images(input_dir, output_pdf, random_mode=False, images_per_page=20,
         random.shuffle(all_files)
         final_files = all_files
     else:
-        # Normal sorting mode
-        singles.sort(key=lambda x: x[1])
-        
+        # Normal sorting mode: families (by last name) go after everyone else,
+        # and singles are sorted once all of them have been collected
         grouped = []
-        for last_name, group in last_name_groups.items():
+        for last_name in sorted(last_name_groups):
+            group = last_name_groups[last_name]
             if len(group) > 1:
                 group.sort(key=lambda x: x[1])
                 grouped.extend(group)
@@ -54,6 +77,12 @@ def process_images(input_dir, output_pdf, random_mode=False, images_per_page=20,
         singles.sort(key=lambda x: x[1])
         final_files = [x[0] for x in singles] + [x[0] for x in grouped]
     
+    # Resize all images in parallel up front; only the drawing happens here
+    paths = [entry.path for entry in final_files]
+    # The default worker count is the CPU count, capped at 61 on Windows
+    with ProcessPoolExecutor() as executor:
+        resized = list(executor.map(_resize, paths, repeat(target_size), chunksize=4))
+    
     # Create PDF
     c = canvas.Canvas(output_pdf, pagesize=letter)
     width, height = letter
@@ -81,31 +110,24 @@ def process_images(input_dir, output_pdf, random_mode=False, images_per_page=20,
                     
                 try:
                     img_file = final_files[current_image]
+                    img_bytes = resized[current_image]
                     
-                    # Open and resize image
-                    img = Image.open(os.path.join(input_dir, img_file))
-                    img = img.convert('RGB')
-                    img.thumbnail(target_size, Image.Resampling.LANCZOS)
-                    
-                    # Save temporary resized image
-                    temp_path = f"temp_resize_{current_image}.jpg"
-                    img.save(temp_path)
-                    
-                    # Add image to PDF
-                    c.drawImage(temp_path, x, y, 
-                              width=img_width, height=img_height,
-                              preserveAspectRatio=True)
-                    
-                    # Add caption only if not in random mode
-                    if not random_mode:
-                        caption = os.path.splitext(img_file)[0]
-                        c.setFont("Helvetica", 8)
-                        c.drawCentredString(x + img_width/2, y - 10, caption)
-                    
-                    os.remove(temp_path)
+                    # Leave the slot empty for images the worker couldn't read (already reported)
+                    if img_bytes is not None:
+                        # Add image to PDF; the reader is built here and dropped
+                        # after drawing, since it caches the decoded pixels
+                        c.drawImage(ImageReader(BytesIO(img_bytes)), x, y, 
+                                  width=img_width, height=img_height,
+                                  preserveAspectRatio=True)
+                        
+                        # Add caption only if not in random mode
+                        if not random_mode:
+                            caption = os.path.splitext(img_file.name)[0]
+                            c.setFont("Helvetica", 8)
+                            c.drawCentredString(x + img_width/2, y - 10, caption)
                     
                 except Exception as e:
-                    print(f"Error processing {img_file}: {str(e)}")
+                    print(f"Error processing {img_file.name}: {str(e)}")
                 
                 x += img_width + x_spacing
                 current_image += 1
@@ -1,140 +1,264 @@
 #!/usr/bin/env python3
 import sys
 import os
-import pdfplumber
+import codecs
+import csv
+import math
+import re
+import numpy as np
 import pandas as pd
-from pathlib import Path
-from typing import List, Dict
+from io import StringIO
+from typing import List, Tuple, Iterator, Optional
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
 
-def extract_data_from_pdf(pdf_path: str) -> List[Dict]:
+# pyarrow's C++ CSV writer is much faster than DataFrame.to_csv on long
+# statements; fall back to pandas when it isn't installed
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = None
+
+# Strip everything but digits from date fields in one C-level pass
+_NONDIGIT = re.compile(r'\D')
+
+# Keep each statement row on one line: join characters across the wide column
+# gaps, but never merge neighbouring rows into one text box
+_LAPARAMS = LAParams(char_margin=200, line_margin=0.1, boxes_flow=None)
+
+def iter_page_text(pdf_path: str, page_numbers: Optional[List[int]] = None) -> Iterator[str]:
     """
-    Extract transaction data from the PDF file.
+    Extract the text of each page, one page at a time.
     
     Args:
         pdf_path (str): Path to the PDF file
+        page_numbers (List[int], optional): Zero-based pages to read (default: all)
         
-    Returns:
-        List[Dict]: List of transactions with date, number, description, etc.
+    Yields:
+        str: The text of the next page, one line per statement row
     """
-    transactions = []
+    rsrcmgr = PDFResourceManager()
+    output = StringIO()
+    device = TextConverter(rsrcmgr, output, laparams=_LAPARAMS)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                # Extract text and split into lines
-                text = page.extract_text()
-                lines = text.split('\n')
+        with open(pdf_path, 'rb') as f:
+            for page in PDFPage.get_pages(f, pagenos=page_numbers):
+                # Reuse the same buffer for every page
+                output.seek(0)
+                output.truncate()
+                interpreter.process_page(page)
+                yield output.getvalue()
+    finally:
+        device.close()
+
+# One statement row: date, optional check number, description, then the
+# transaction amount (missing on rows such as BEGINNING BALANCE) and the
+# running balance. Only the last amount before the balance is the row's
+# amount; any earlier number stays in the description. Matched line by
+# line over a whole page, so whitespace ([^\S\n]) never crosses a newline
+_AMOUNT = r'-?\d[\d,]*\.\d{2}'
+_WS = r'[^\S\n]'
+_TXN = re.compile(
+    rf'^{_WS}*(\d\S*){_WS}+(?:(\d+){_WS}+)?(?:(.+?){_WS}+)?'
+    rf'(?:({_AMOUNT}){_WS}+)?({_AMOUNT}){_WS}*$',
+    re.MULTILINE
+)
+
+# The column header row at the top of each page's transaction list
+_HDR = re.compile(r'\bDate\b.*\bNumber\b.*\bDescription\b')
+
+# The first two words of a description (e.g., "ELECTRONIC PAYMENT"); also
+# matches an empty description, so every row gets a key
+_KEY_WORDS = re.compile(r'^(\S*\s*\S*)')
+
+# Fewest pages worth handing to a worker process; starting one costs about
+# as much as extracting several pages
+PAGES_PER_WORKER = 10
+
+# Columns of the transaction rows yielded by extract_data_from_pdf; main()
+# combines Year, Month and Day into the Date column
+COLUMNS = ['Year', 'Month', 'Day', 'Number', 'Description', 'Withdrawals', 'Deposits', 'Balance']
+Transaction = Tuple[int, int, int, str, str, float, float, str]
+
+def parse_page(text: str) -> Iterator[Transaction]:
+    """
+    Parse the transactions out of one page of statement text.
+    
+    Args:
+        text (str): The page text
+        
+    Yields:
+        Transaction: One transaction per row, in COLUMNS order
+    """
+    # Skip header lines
+    header = _HDR.search(text)
+    start = 0
+    if header:
+        end_of_line = text.find('\n', header.end())
+        start = len(text) if end_of_line < 0 else end_of_line + 1
+    
+    # Let the regex engine walk the page and pick out the transaction
+    # lines, rather than splitting and testing each line in Python
+    for match in _TXN.finditer(text, start):
+        date, check_number, description, amount, balance = match.groups()
+        
+        # Split the date into integer year, month and day; the values are
+        # checked for the whole column at once by pandas in main()
+        try:
+            # Fast path for the usual MM/DD/YYYY or MM/DD/YY form
+            if ((len(date) == 10 or len(date) == 8) and date[2] == '/' and date[5] == '/'
+                    and date.isascii() and date[:2].isdigit() and date[3:5].isdigit()
+                    and date[6:].isdigit()):
+                month, day, year = int(date[:2]), int(date[3:5]), int(date[6:])
+                if len(date) == 8:
+                    year += 2000
+            elif '/' in date:  # Handle dates with separators
+                date_parts = date.split('/')
+                if len(date_parts) != 3:
+                    print(f"Warning: Unexpected date format: {date}")
+                    continue
+                # Clean any non-digits
+                mm, dd, yy = (_NONDIGIT.sub('', part) for part in date_parts)
+                if not (mm and dd and yy):
+                    print(f"Warning: Unexpected date format: {date}")
+                    continue
                 
-                # Skip header lines
-                start_idx = 0
-                for i, line in enumerate(lines):
-                    if 'Date' in line and 'Number' in line and 'Description' in line:
-                        start_idx = i + 1
-                        break
+                month, day, year = int(mm), int(dd), int(yy)
+                if len(yy) == 2:
+                    year += 2000
+            else:
+                # Remove any other separators
+                date_clean = _NONDIGIT.sub('', date)
                 
-                # Process transaction lines
-                for line in lines[start_idx:]:
-                    # Skip empty lines and headers
-                    if not line.strip() or 'Date' in line and 'Number' in line:
-                        continue
-                        
-                    # Split line into components
-                    parts = line.split()
-                    
-                    # Parse date
-                    if not parts[0][0].isdigit():
-                        continue
-                    
-                    # Parse and format date
-                    date = parts[0]
-                    try:
-                        if '/' in date:  # Handle dates with separators
-                            mm, dd, yy = date.split('/')
-                            # Clean any non-digits
-                            mm = ''.join(c for c in mm if c.isdigit())
-                            dd = ''.join(c for c in dd if c.isdigit())
-                            yy = ''.join(c for c in yy if c.isdigit())
-                            
-                            if len(yy) == 2:
-                                yyyy = '20' + yy
-                            else:
-                                yyyy = yy
-                        else:
-                            # Remove any other separators
-                            date_clean = ''.join(c for c in date if c.isdigit())
-                            
-                            if len(date_clean) == 8:  # MMDDYYYY
-                                mm = date_clean[:2]
-                                dd = date_clean[2:4]
-                                yyyy = date_clean[4:]
-                            elif len(date_clean) == 6:  # MMDDYY
-                                mm = date_clean[:2]
-                                dd = date_clean[2:4]
-                                yy = date_clean[4:]
-                                yyyy = '20' + yy
-                            else:
-                                print(f"Warning: Unexpected date format: {date}")
-                                continue
-                            
-                        # Validate month and day
-                        mm_int = int(mm)
-                        dd_int = int(dd)
-                        if not (1 <= mm_int <= 12 and 1 <= dd_int <= 31):
-                            print(f"Warning: Invalid date values: {mm}/{dd}/{yyyy}")
-                            continue
-                            
-                        date = f"{mm}/{dd}/{yyyy}"
-                    except ValueError as e:
-                        print(f"Warning: Could not parse date '{date}': {e}")
-                        continue
-                    
-                    # Check if there's a check number
-                    current_idx = 1
-                    check_number = ''
-                    if len(parts) > 1 and parts[current_idx].isdigit():
-                        check_number = parts[current_idx]
-                        current_idx += 1
-                    
-                    # Find withdrawal/deposit amounts
-                    withdrawal = ''
-                    deposit = ''
-                    balance = parts[-1]
-                    
-                    # Look for amounts from the end
-                    amount_idx = -2  # Start before balance
-                    while abs(amount_idx) <= len(parts):
-                        try:
-                            float(parts[amount_idx].replace(',', ''))
-                            if not withdrawal:
-                                withdrawal = parts[amount_idx]
-                            elif not deposit:
-                                deposit = withdrawal
-                                withdrawal = ''
-                            break
-                        except (ValueError, IndexError):
-                            amount_idx -= 1
-                    
-                    # Get description (everything between check number/date and amounts)
-                    desc_end = amount_idx if abs(amount_idx) < len(parts) else -1
-                    description = ' '.join(parts[current_idx:desc_end])
-                    
-                    transaction = {
-                        'Date': date,
-                        'Number': check_number,
-                        'Description': description,
-                        'Withdrawals': withdrawal,
-                        'Deposits': deposit,
-                        'Balance': balance
-                    }
-                    
-                    transactions.append(transaction)
+                if len(date_clean) == 8:  # MMDDYYYY
+                    month, day, year = int(date_clean[:2]), int(date_clean[2:4]), int(date_clean[4:])
+                elif len(date_clean) == 6:  # MMDDYY
+                    month, day, year = int(date_clean[:2]), int(date_clean[2:4]), 2000 + int(date_clean[4:])
+                else:
+                    print(f"Warning: Unexpected date format: {date}")
+                    continue
+        except ValueError as e:
+            # A stray character int() can't read; skip the row like any other bad date
+            print(f"Warning: Could not parse date '{date}': {e}")
+            continue
         
-        return transactions
+        # _TXN has already validated the amount against _AMOUNT, so it
+        # converts to float once the thousands separators are removed; the
+        # statement shows one amount per row and it goes under Withdrawals
+        yield (year,
+               month,
+               day,
+               check_number or '',
+               ' '.join(description.split()) if description else '',
+               float(amount.replace(',', '')) if amount else math.nan,
+               math.nan,
+               balance)
+
+def extract_pages(pdf_path: str, page_numbers: Optional[List[int]] = None) -> List[Transaction]:
+    """
+    Extract the transactions from some or all of the pages of the PDF file.
+    Also runs in worker processes, so it returns a list rather than a generator.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        page_numbers (List[int], optional): Zero-based pages to read (default: all)
+        
+    Returns:
+        List[Transaction]: The transactions on those pages, in page order
+    """
+    return [row for text in iter_page_text(pdf_path, page_numbers) for row in parse_page(text)]
+
+def count_pages(pdf_path: str) -> int:
+    """
+    Count the pages in the PDF file from the page tree's /Count entry,
+    without walking or extracting any of the pages.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        
+    Returns:
+        int: Number of pages
+    """
+    with open(pdf_path, 'rb') as f:
+        document = PDFDocument(PDFParser(f))
+        return resolve1(resolve1(document.catalog['Pages'])['Count'])
+
+def extract_data_from_pdf(pdf_path: str) -> List[Transaction]:
+    """
+    Extract transaction data from the PDF file, splitting the pages
+    between worker processes.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        
+    Returns:
+        List[Transaction]: One transaction per row, in COLUMNS order; empty
+        if any page fails, so a statement is never partially converted
+    """
+    try:
+        # Each worker re-imports this module and re-parses the PDF, so only
+        # statements long enough to give every worker PAGES_PER_WORKER pages
+        # are split up; the usual monthly statement is read in-process
+        page_count = count_pages(pdf_path)
+        workers = min(os.cpu_count() or 1, page_count // PAGES_PER_WORKER)
+        if workers <= 1:
+            return extract_pages(pdf_path)
+        
+        # Give each worker one contiguous run of pages
+        chunk_size = -(-page_count // workers)
+        chunks = [list(range(i, min(i + chunk_size, page_count)))
+                  for i in range(0, page_count, chunk_size)]
+        
+        # Collect every chunk before returning anything
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return [row for rows in executor.map(extract_pages, repeat(pdf_path), chunks)
+                    for row in rows]
     
     except Exception as e:
         print(f"Error processing file: {e}")
         return []
 
+def write_csv_with_pyarrow(df: pd.DataFrame, output_file: str, date_format: str) -> None:
+    """
+    Write the transactions to a UTF-8 CSV file with a BOM (for Excel) using pyarrow.
+    Dates and amounts are written as the same text pandas would write; pyarrow
+    does put quotes around every text field, which pandas only does when needed.
+    
+    Args:
+        df (pd.DataFrame): The transactions, in COLUMNS order with a Date column
+        output_file (str): Path of the CSV file to create
+        date_format (str): strftime format for the Date column
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    
+    # Whole-second timestamps, or %S would print fractional seconds
+    date_idx = table.schema.get_field_index('Date')
+    dates = table.column(date_idx).cast(pa.timestamp('s'))
+    table = table.set_column(date_idx, 'Date', pc.strftime(dates, format=date_format))
+    
+    # pandas writes whole amounts as 5.0 where pyarrow writes 5
+    for column in ('Withdrawals', 'Deposits'):
+        idx = table.schema.get_field_index(column)
+        text = pc.cast(table.column(idx), pa.string())
+        whole = pc.invert(pc.match_substring(text, '.'))
+        table = table.set_column(idx, column,
+                                 pc.if_else(whole, pc.binary_join_element_wise(text, '.0', ''), text))
+    
+    with open(output_file, 'wb') as f:
+        f.write(codecs.BOM_UTF8)
+        pacsv.write_csv(table, f)
+
 def find_pdf_files() -> List[str]:
     """
     Find all PDF files in the current directory.
@@ -142,7 +266,7 @@ def find_pdf_files() -> List[str]:
     Returns:
         List[str]: List of PDF filenames
     """
-    return [f for f in os.listdir() if f.lower().endswith('.pdf')]
+    return [e.name for e in os.scandir() if e.name.lower().endswith('.pdf') and e.is_file()]
 
 def main():
     # Get input filename
@@ -166,112 +290,89 @@ def main():
         print(f"Error: File '{pdf_file}' not found")
         sys.exit(1)
     
-    # Extract data from PDF
-    transactions = extract_data_from_pdf(pdf_file)
+    # Extract data from PDF straight into a DataFrame; the amounts are already
+    # floats, so Withdrawals and Deposits come out as float64 columns
+    df = pd.DataFrame.from_records(extract_data_from_pdf(pdf_file), columns=COLUMNS)
     
-    if not transactions:
+    # Build the dates from their integer parts in one vectorized pass;
+    # impossible dates (e.g. month 13) come back as NaT and those rows are dropped
+    parts = df[['Year', 'Month', 'Day']]
+    dates = pd.to_datetime(parts.rename(columns=str.lower), errors='coerce')
+    invalid = dates.isna()
+    for year, month, day in parts[invalid].itertuples(index=False, name=None):
+        print(f"Warning: Invalid date values: {month:02}/{day:02}/{year}")
+    df = df[~invalid].drop(columns=['Year', 'Month', 'Day'])
+    df.insert(0, 'Date', dates[~invalid])
+    
+    if df.empty:
         print("No transactions found or error processing file")
         sys.exit(1)
     
-    # Convert to DataFrame and sort by date
-    df = pd.DataFrame(transactions)
-    # Convert dates to datetime objects with explicit format
-    df['Date'] = pd.to_datetime(df['Date'], format='%m/%d/%Y')
+    # Sort by Description first, then by Date ascending; the integer codes of
+    # the descriptions as a category sort without any string compares
+    description_codes = df['Description'].astype('category').cat.codes
+    df = df.iloc[np.lexsort((df['Date'].to_numpy(), description_codes.to_numpy()))]
     
-    # Convert amount columns to numeric, removing any commas
-    df['Withdrawals'] = pd.to_numeric(df['Withdrawals'].str.replace(',', ''), errors='coerce')
-    df['Deposits'] = pd.to_numeric(df['Deposits'].str.replace(',', ''), errors='coerce')
+    # Descriptions used more than once are totalled as exact matches; the rest
+    # are grouped on their first two words (e.g., "ELECTRONIC PAYMENT")
+    is_exact = df['Description'].duplicated(keep=False)
+    # Only the rows left over from the exact matches need their key words
+    remaining = df.loc[~is_exact, 'Description']
+    key_words = remaining.str.extract(_KEY_WORDS, expand=False)
+    group_key = df['Description'].where(is_exact, key_words).rename('Key')
+    sort_order = is_exact.map({True: 1, False: 2}).rename('Sort_Order')
     
-    # Sort by Description first, then by Date ascending
-    df = df.sort_values(['Description', 'Date'], ascending=[True, True])
+    # Calculate both exact and partial matches in a single groupby
+    totals = df.groupby([sort_order, group_key]).agg(
+        Count=('Description', 'size'),
+        Withdrawals=('Withdrawals', 'sum'),
+        Deposits=('Deposits', 'sum')
+    )
+    totals = totals[totals['Count'] > 1]  # Only group if multiple transactions
     
-    # Function to get the first meaningful words (e.g., "ELECTRONIC PAYMENT")
-    def get_key_words(description):
-        words = description.split()
-        if len(words) >= 2:
-            return ' '.join(words[:2])
-        return description
-
-    # Calculate both exact and partial matches
-    summary_data = []
-    processed_descriptions = set()
+    # Label the groups and blank out empty totals for the whole summary at once
+    summary_df = totals.reset_index()
+    count_text = ' (' + summary_df['Count'].astype(str) + ' transactions)'
+    summary_df['Description'] = (
+        'TOTAL for exact matches: ' + summary_df['Key'] + count_text
+    ).where(summary_df['Sort_Order'] == 1,
+            'TOTAL for partial matches: ' + summary_df['Key'] + '...' + count_text)
+    for column in ('Withdrawals', 'Deposits'):
+        summary_df[column] = summary_df[column].astype(object).where(summary_df[column] > 0, '')
+    # The groupby already ordered the exact matches before the partial ones
+    summary_df = summary_df.reindex(columns=df.columns, fill_value='')
     
-    # First pass: Find exact matches
-    for desc, group in df.groupby('Description'):
-        if len(group) > 1:  # Only group if multiple transactions
-            withdrawals_sum = group['Withdrawals'].sum()
-            deposits_sum = group['Deposits'].sum()
-            count = len(group)
-            
-            summary_data.append({
-                'Date': '',
-                'Number': '',
-                'Description': f"TOTAL for exact matches: {desc} ({count} transactions)",
-                'Withdrawals': withdrawals_sum if withdrawals_sum > 0 else '',
-                'Deposits': deposits_sum if deposits_sum > 0 else '',
-                'Balance': '',
-                'Sort_Order': 1  # For sorting summaries
-            })
-            processed_descriptions.update(group.index)
-    
-    # Second pass: Find partial matches among remaining transactions
-    remaining_df = df.loc[~df.index.isin(processed_descriptions)]
-    
-    partial_groups = remaining_df.groupby(remaining_df['Description'].apply(get_key_words))
+    # Create output filename
+    output_file = os.path.splitext(pdf_file)[0] + '.csv'
     
-    for key_words, group in partial_groups:
-        if len(group) > 1:  # Only group if multiple transactions
-            withdrawals_sum = group['Withdrawals'].sum()
-            deposits_sum = group['Deposits'].sum()
-            count = len(group)
-            
-            summary_data.append({
-                'Date': '',
-                'Number': '',
-                'Description': f"TOTAL for partial matches: {key_words}... ({count} transactions)",
-                'Withdrawals': withdrawals_sum if withdrawals_sum > 0 else '',
-                'Deposits': deposits_sum if deposits_sum > 0 else '',
-                'Balance': '',
-                'Sort_Order': 2  # For sorting summaries
-            })
-            processed_descriptions.update(group.index)
+    # Dates are written as plain dates, or with the time when there is a
+    # summary, just as the single to_csv call over the combined frame did
+    date_format = '%Y-%m-%d' if summary_df.empty else '%Y-%m-%d %H:%M:%S'
     
-    if summary_data:
-        # Create summary DataFrame and sort by Sort_Order
-        summary_df = pd.DataFrame(summary_data)
-        summary_df = summary_df.sort_values('Sort_Order')
-        summary_df = summary_df.drop('Sort_Order', axis=1)
-        
-        # Add a blank row between data and summary
-        blank_row = pd.DataFrame([{
-            'Date': '',
-            'Number': '',
-            'Description': '',
-            'Withdrawals': '',
-            'Deposits': '',
-            'Balance': ''
-        }])
-        
-        # Combine main data, blank row, and summary
-        final_df = pd.concat([df, blank_row, summary_df], ignore_index=True)
+    # Save to CSV: the transactions first, then a blank row and the summary
+    # are appended after them, so the sections are never copied into one frame
+    if pa is not None:
+        write_csv_with_pyarrow(df, output_file, date_format)
     else:
-        final_df = df
-    
-    # Create output filename
-    output_file = str(Path(pdf_file).with_suffix('.csv'))
+        df.to_csv(output_file, index=False, encoding='utf-8-sig', lineterminator='\n',
+                  date_format=date_format)
     
-    # Save to CSV
-    final_df.to_csv(output_file, index=False, encoding='utf-8-sig')
+    if not summary_df.empty:
+        with open(output_file, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow([''] * len(summary_df.columns))
+            writer.writerows(summary_df.itertuples(index=False, name=None))
     
     # Print summary to console if exists
-    if summary_data:
+    if not summary_df.empty:
         print("\nSummary Totals:")
-        for summary in summary_data:
-            print(f"\n{summary['Description']}")
-            if summary['Withdrawals']:
-                print(f"  Total Withdrawals: ${summary['Withdrawals']:,.2f}")
-            if summary['Deposits']:
-                print(f"  Total Deposits: ${summary['Deposits']:,.2f}")
+        for description, withdrawals, deposits in summary_df[
+                ['Description', 'Withdrawals', 'Deposits']].itertuples(index=False, name=None):
+            print(f"\n{description}")
+            if withdrawals:
+                print(f"  Total Withdrawals: ${withdrawals:,.2f}")
+            if deposits:
+                print(f"  Total Deposits: ${deposits:,.2f}")
     else:
         print("\nNo groups found for summarization.")
     print(f"Data saved to {output_file}")